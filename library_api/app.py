@@ -1,17 +1,29 @@
 # app.py
+import hashlib
+import re
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Annotated, Optional, List
 
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
 from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import jwt, JWTError
-from passlib.context import CryptContext
-from pydantic import BaseModel, EmailStr, Field, constr
-from pydantic_settings import BaseSettings
+import jwt
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints, TypeAdapter
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import (
-    create_engine, Integer, String, Boolean, DateTime, ForeignKey, func
+    delete, event, insert, select, text, update, Integer, String, Boolean, DateTime, ForeignKey, Index, func
 )
-from sqlalchemy.orm import sessionmaker, DeclarativeBase, Mapped, mapped_column, relationship, Session
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, raiseload
 
 # -------------------- Settings (.env) --------------------
 class Settings(BaseSettings):
@@ -20,34 +32,111 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./library.db"
     ADMIN_DEFAULT_USERNAME: str = "admin"
     ADMIN_DEFAULT_PASSWORD: str = "admin1234"
+    JWT_CACHE_TTL_SECONDS: int = 5
+    USER_CACHE_TTL_SECONDS: int = 30
+    # 기존 해시(passlib 기본값 $2b$12$)와 같은 cost: 더미 해시와 실제 해시 검증 시간이 같아야 함
+    BCRYPT_ROUNDS: int = 12
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
 
-    class Config:
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
 ALGORITHM = "HS256"
 
 # -------------------- DB --------------------
 class Base(DeclarativeBase): ...
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+_db_url = make_url(settings.DATABASE_URL)
+IS_SQLITE = _db_url.get_backend_name() == "sqlite"
+
+# backend 이름 -> async 드라이버 (postgres://는 레거시 scheme)
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def _async_url(url: URL) -> URL:
+    # DATABASE_URL은 동기 형식(드라이버 지정 포함) 그대로 두고 async 드라이버로 치환
+    drivername = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise RuntimeError(f"Unsupported DATABASE_URL backend: {url.get_backend_name()!r} (use sqlite or postgresql)")
+    return url.set(drivername=drivername)
+
+# in-memory SQLite는 StaticPool을 쓰므로 QueuePool 크기 옵션을 넘기면 안 됨
+IS_SQLITE_MEMORY = IS_SQLITE and _db_url.database in (None, "", ":memory:")
+_pool_kwargs = {} if IS_SQLITE_MEMORY else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+}
+
+engine = create_async_engine(
+    _async_url(_db_url),
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    **_pool_kwargs,
+)
+
+if IS_SQLITE:
+    # WAL: 읽기와 쓰기가 서로 막지 않도록
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_pragma(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.close()
+
+# commit 후 속성 만료 시 async에서는 암묵적 재조회가 불가하므로 expire_on_commit=False
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 # -------------------- Password / JWT --------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 신규 해시는 bcrypt(C 바인딩 직접 호출), 기존 argon2id 해시는 검증만 하고 그대로 유지
+_argon2 = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    # 의존성 캐시로 요청 하나에 세션 하나 (get_current_user와 핸들러가 공유)
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def _pw_bytes(p: str) -> bytes:
+    # bcrypt는 앞 72바이트만 사용 (passlib과 동일하게 잘라서 기존 해시와 호환)
+    return p.encode("utf-8")[:72]
 
 def hash_pw(p: str) -> str:
-    return pwd_context.hash(p)
+    return bcrypt.hashpw(_pw_bytes(p), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode()
 
 def verify_pw(p: str, hashed: str) -> bool:
-    return pwd_context.verify(p, hashed)
+    if hashed.startswith("$argon2"):
+        try:
+            return _argon2.verify(hashed, p)
+        except (VerificationError, InvalidHashError):
+            return False
+    try:
+        return bcrypt.checkpw(_pw_bytes(p), hashed.encode())
+    except ValueError:
+        return False
+
+def pw_needs_rehash(hashed: str) -> bool:
+    # bcrypt cost가 현재 설정(BCRYPT_ROUNDS)보다 낮을 때만 재해시
+    # argon2id(메모리 하드) 등 bcrypt가 아닌 해시는 더 약한 bcrypt로 바꾸지 않음
+    if not hashed.startswith("$2"):
+        return False
+    return int(hashed.split("$")[2]) < settings.BCRYPT_ROUNDS
+
+# 존재하지 않는 username 로그인 시에도 동일한 해시 검증 비용을 쓰기 위한 더미 해시
+# (저장된 bcrypt 해시와 같은 BCRYPT_ROUNDS로 만들어야 응답 시간으로 username을 구분할 수 없음)
+_DUMMY_HASH = hash_pw("x" * 16)
+
+# 아래 캐시들은 async 핸들러에서만(이벤트 루프 단일 스레드) 접근하므로 lock 불필요
+# 검증된 토큰 캐시: sha256(token) -> (username, exp)
+_tok_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.JWT_CACHE_TTL_SECONDS)
+
+# 인증된 사용자 캐시: username -> 세션에서 분리(expunge)된 User
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_user_cache(username: str) -> None:
+    _user_cache.pop(username, None)
 
 def create_access_token(sub: str, expires_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
     to_encode = {"sub": sub, "exp": datetime.utcnow() + timedelta(minutes=expires_minutes)}
@@ -72,13 +161,17 @@ class Book(Base):
     title: Mapped[str] = mapped_column(String(255), index=True)
     author: Mapped[str] = mapped_column(String(255), index=True)
     isbn: Mapped[str] = mapped_column(String(32), unique=True, index=True)
-    category: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    category: Mapped[Optional[str]] = mapped_column(String(100))
     total_copies: Mapped[int] = mapped_column(Integer, default=1)
     available_copies: Mapped[int] = mapped_column(Integer, default=1)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
     loans: Mapped[List["Loan"]] = relationship(back_populates="book")
 
+    __table_args__ = (
+        Index("ix_books_category_avail", "category", "available_copies"),
+    )
+
 class Loan(Base):
     __tablename__ = "loans"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -87,35 +180,47 @@ class Loan(Base):
     borrowed_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     returned_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
-    user: Mapped[User] = relationship(back_populates="loans")
-    book: Mapped[Book] = relationship(back_populates="loans")
+    # 암묵적 lazy load(N+1) 금지: 필요한 곳에서 selectinload로 명시적으로 로드
+    user: Mapped[User] = relationship(back_populates="loans", lazy="raise")
+    book: Mapped[Book] = relationship(back_populates="loans", lazy="raise")
 
-Base.metadata.create_all(engine)
+    __table_args__ = (
+        Index("ix_loans_book_active", "book_id", "returned_at"),
+        Index(
+            "ix_loans_user_book_active", "user_id", "book_id", "returned_at",
+            postgresql_where=text("returned_at IS NULL"),
+        ),
+    )
 
-# bootstrap admin
-with SessionLocal() as db:
-    if not db.query(User).filter(User.username == settings.ADMIN_DEFAULT_USERNAME).first():
-        db.add(User(
-            username=settings.ADMIN_DEFAULT_USERNAME,
-            email=f"{settings.ADMIN_DEFAULT_USERNAME}@local",
-            full_name="Admin",
-            password_hash=hash_pw(settings.ADMIN_DEFAULT_PASSWORD),
-            is_admin=True
-        ))
-        db.commit()
+async def init_db() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # bootstrap admin
+    async with SessionLocal() as db:
+        if not await db.scalar(select(User.id).where(User.username == settings.ADMIN_DEFAULT_USERNAME)):
+            db.add(User(
+                username=settings.ADMIN_DEFAULT_USERNAME,
+                email=f"{settings.ADMIN_DEFAULT_USERNAME}@local",
+                full_name="Admin",
+                password_hash=hash_pw(settings.ADMIN_DEFAULT_PASSWORD),
+                is_admin=True
+            ))
+            await db.commit()
 
 # -------------------- Schemas (Pydantic) --------------------
-ISBN = constr(strip_whitespace=True, pattern=r"^[0-9Xx\-]{10,17}$")
+ISBN_RE = re.compile(r"^[0-9Xx\-]{10,17}$")
+ISBN = Annotated[str, StringConstraints(strip_whitespace=True, pattern=ISBN_RE.pattern)]
 
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
 class SignupIn(BaseModel):
-    username: constr(strip_whitespace=True, min_length=3, max_length=50)
+    username: Annotated[str, StringConstraints(strip_whitespace=True, min_length=3, max_length=50)]
     email: EmailStr
-    password: constr(min_length=8, max_length=128)
-    full_name: Optional[constr(max_length=255)] = None
+    password: Annotated[str, StringConstraints(min_length=8, max_length=128)]
+    full_name: Optional[Annotated[str, StringConstraints(max_length=255)]] = None
 
 class UserOut(BaseModel):
     id: int
@@ -123,13 +228,13 @@ class UserOut(BaseModel):
     email: EmailStr
     full_name: Optional[str]
     is_admin: bool
-    class Config: orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BookCreate(BaseModel):
-    title: constr(min_length=1, max_length=255)
-    author: constr(min_length=1, max_length=255)
+    title: Annotated[str, StringConstraints(min_length=1, max_length=255)]
+    author: Annotated[str, StringConstraints(min_length=1, max_length=255)]
     isbn: ISBN
-    category: Optional[constr(max_length=100)] = None
+    category: Optional[Annotated[str, StringConstraints(max_length=100)]] = None
     total_copies: int = Field(ge=1, default=1)
 
 class BookOut(BaseModel):
@@ -140,7 +245,7 @@ class BookOut(BaseModel):
     category: Optional[str]
     total_copies: int
     available_copies: int
-    class Config: orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BorrowIn(BaseModel):
     book_id: int
@@ -151,126 +256,190 @@ class LoanOut(BaseModel):
     book_id: int
     borrowed_at: datetime
     returned_at: Optional[datetime]
-    class Config: orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 리스트 응답용 어댑터는 모듈 로드 시 한 번만 생성
+BOOK_LIST_ADAPTER = TypeAdapter(List[BookOut])
 
 # -------------------- Auth helpers --------------------
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")  # type: ignore
-    except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _tok_cache.get(key)
+    if cached and cached[1] > time.time():
+        username = cached[0]
+    else:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+            username: str = payload.get("sub")  # type: ignore
+        except jwt.PyJWTError:
+            raise credentials_exception
+        if username and payload.get("exp"):
+            _tok_cache[key] = (username, payload["exp"])
+    user = _user_cache.get(username)
+    if user is not None:
+        return user
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise credentials_exception
+    db.expunge(user)
+    _user_cache[username] = user
     return user
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+async def require_admin(user: User = Depends(get_current_user)) -> User:
     if not user.is_admin:
         raise HTTPException(status_code=403, detail="Admin required")
     return user
 
 # -------------------- FastAPI --------------------
-app = FastAPI(title="RGT Library API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    yield
+    await engine.dispose()
+
+app = FastAPI(title="RGT Library API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # 1) 인증/인가
 @app.post("/auth/signup", response_model=UserOut, status_code=201)
-def signup(data: SignupIn, db: Session = Depends(get_db)):
-    if db.query(User).filter((User.username == data.username) | (User.email == data.email)).first():
-        raise HTTPException(400, "username or email already exists")
-    user = User(
+async def signup(data: SignupIn, db: AsyncSession = Depends(get_db)):
+    # 해시 계산은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    password_hash = await run_in_threadpool(hash_pw, data.password)
+    # 중복 검사는 username/email unique 제약에 맡김
+    # INSERT ... RETURNING 으로 기본값까지 한 번에 받아옴 (refresh 불필요)
+    stmt = insert(User).values(
         username=data.username,
         email=data.email,
         full_name=data.full_name,
-        password_hash=hash_pw(data.password),
+        password_hash=password_hash,
         is_admin=False
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    ).returning(User)
+    try:
+        user = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(400, "username or email already exists")
+    invalidate_user_cache(user.username)
     return user
 
 @app.post("/auth/login", response_model=Token)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form.username).first()
-    if not user or not verify_pw(form.password, user.password_hash):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == form.username))
+    if user is None:
+        await run_in_threadpool(verify_pw, form.password, _DUMMY_HASH)
+        raise HTTPException(401, "invalid credentials")
+    if not await run_in_threadpool(verify_pw, form.password, user.password_hash):
         raise HTTPException(401, "invalid credentials")
+    if pw_needs_rehash(user.password_hash):
+        user.password_hash = await run_in_threadpool(hash_pw, form.password)
+        await db.commit()
+        invalidate_user_cache(user.username)
     return {"access_token": create_access_token(user.username)}
 
 @app.get("/users/me", response_model=UserOut)
-def me(user: User = Depends(get_current_user)):
+async def me(user: User = Depends(get_current_user)):
     return user
 
 @app.get("/users/me/loans", response_model=List[LoanOut])
-def my_loans(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Loan).filter(Loan.user_id == user.id).order_by(Loan.id.desc()).all()
+async def my_loans(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    rows = await db.scalars(
+        select(Loan).options(raiseload("*")).where(Loan.user_id == user.id).order_by(Loan.id.desc())
+    )
+    return rows.all()
 
 # 2) 도서 관리 (Admin)
 @app.post("/books", response_model=BookOut, status_code=201)
-def create_book(payload: BookCreate, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
-    if db.query(Book).filter(Book.isbn == payload.isbn).first():
+async def create_book(payload: BookCreate, db: AsyncSession = Depends(get_db), admin: User = Depends(require_admin)):
+    if await db.scalar(select(Book.id).where(Book.isbn == payload.isbn)):
         raise HTTPException(400, "ISBN already exists")
-    book = Book(
+    stmt = insert(Book).values(
         title=payload.title, author=payload.author, isbn=payload.isbn,
         category=payload.category, total_copies=payload.total_copies,
         available_copies=payload.total_copies
-    )
-    db.add(book); db.commit(); db.refresh(book)
+    ).returning(Book)
+    book = (await db.execute(stmt)).scalar_one()
+    await db.commit()
     return book
 
 @app.get("/books", response_model=List[BookOut])
-def list_books(
+async def list_books(
     category: Optional[str] = Query(None),
     available: Optional[bool] = Query(None),
     q: Optional[str] = Query(None, description="title/author contains"),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    after_id: Optional[int] = Query(None, description="keyset pagination: id > after_id"),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(Book)
+    stmt = select(Book)
+    if after_id is not None:
+        stmt = stmt.where(Book.id > after_id)
     if category:
-        query = query.filter(Book.category == category)
+        stmt = stmt.where(Book.category == category)
     if available is True:
-        query = query.filter(Book.available_copies > 0)
+        stmt = stmt.where(Book.available_copies > 0)
     if q:
         like = f"%{q}%"
-        query = query.filter((Book.title.ilike(like)) | (Book.author.ilike(like)))
-    return query.order_by(Book.id.asc()).all()
+        stmt = stmt.where((Book.title.ilike(like)) | (Book.author.ilike(like)))
+    rows = (await db.scalars(stmt.order_by(Book.id.asc()).offset(offset).limit(limit))).all()
+    return BOOK_LIST_ADAPTER.validate_python(rows, from_attributes=True)
 
 @app.delete("/books/{book_id}", status_code=204)
-def delete_book(book_id: int, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
-    book = db.get(Book, book_id)
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_db), admin: User = Depends(require_admin)):
+    book = await db.get(Book, book_id)
     if not book: raise HTTPException(404, "book not found")
-    if db.query(Loan).filter(Loan.book_id == book_id, Loan.returned_at.is_(None)).count():
+    if await db.scalar(select(Loan.id).where(Loan.book_id == book_id, Loan.returned_at.is_(None)).limit(1)) is not None:
         raise HTTPException(409, "book has active loans")
-    db.delete(book); db.commit()
+    # 반납된 대출 기록도 사용자 이력(/users/me/loans)이므로 지우지 않고 삭제를 거부
+    if await db.scalar(select(Loan.id).where(Loan.book_id == book_id).limit(1)) is not None:
+        raise HTTPException(409, "book has loan history")
+    await db.execute(delete(Book).where(Book.id == book_id))
+    await db.commit()
     return
 
 # 3) 대출/반납
 @app.post("/loans", response_model=LoanOut, status_code=201)
-def borrow(data: BorrowIn, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    book = db.get(Book, data.book_id)
-    if not book: raise HTTPException(404, "book not found")
-    if book.available_copies <= 0:
-        raise HTTPException(409, "no available copies")
+async def borrow(data: BorrowIn, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     # 이미 대출 중인지 여부는 정책에 따라: 여기선 중복 대출 허용 X
-    active = db.query(Loan).filter(Loan.user_id == user.id, Loan.book_id == book.id, Loan.returned_at.is_(None)).first()
+    active = await db.scalar(
+        select(Loan.id).where(Loan.user_id == user.id, Loan.book_id == data.book_id, Loan.returned_at.is_(None)).limit(1)
+    )
     if active:
         raise HTTPException(409, "already borrowed")
-    book.available_copies -= 1
-    loan = Loan(user_id=user.id, book_id=book.id)
-    db.add(loan); db.commit(); db.refresh(loan)
+    # 조건부 UPDATE 한 번으로 재고 확인 + 차감 (동시 요청 시 초과 대출 방지)
+    updated = (await db.execute(
+        update(Book)
+        .where(Book.id == data.book_id, Book.available_copies > 0)
+        .values(available_copies=Book.available_copies - 1)
+    )).rowcount
+    if updated == 0:
+        if not await db.get(Book, data.book_id): raise HTTPException(404, "book not found")
+        raise HTTPException(409, "no available copies")
+    loan = (await db.execute(
+        insert(Loan).values(user_id=user.id, book_id=data.book_id).returning(Loan)
+    )).scalar_one()
+    await db.commit()
     return loan
 
 @app.post("/loans/{loan_id}/return", response_model=LoanOut)
-def return_book(loan_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    loan = db.get(Loan, loan_id)
+async def return_book(loan_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    loan = await db.get(Loan, loan_id)
     if not loan: raise HTTPException(404, "loan not found")
     if loan.user_id != user.id and not user.is_admin:
         raise HTTPException(403, "not your loan")
-    if loan.returned_at is not None:
+    # 반납 처리도 조건부 UPDATE: 동시 반납 시 한 요청만 성공해 재고가 중복 증가하지 않음
+    returned = (await db.execute(
+        update(Loan)
+        .where(Loan.id == loan_id, Loan.returned_at.is_(None))
+        .values(returned_at=datetime.utcnow())
+    )).rowcount
+    if returned != 1:
         raise HTTPException(409, "already returned")
-    loan.returned_at = datetime.utcnow()
-    book = db.get(Book, loan.book_id)
-    book.available_copies += 1
-    db.commit(); db.refresh(loan)
+    await db.execute(
+        update(Book)
+        .where(Book.id == loan.book_id)
+        .values(available_copies=Book.available_copies + 1)
+    )
+    await db.commit(); await db.refresh(loan)
     return loan
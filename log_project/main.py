@@ -1,25 +1,79 @@
-from datetime import datetime
+import os
+import time
 from pathlib import Path
+from typing import Iterator, List
+
+# 초 단위로 포맷된 타임스탬프 캐시 (포맷 작업은 초당 최대 1회)
+_ts_sec = 0
+_ts_str = ""
+
+def _now_ts():
+    global _ts_sec, _ts_str
+    s = int(time.time())
+    if s != _ts_sec:
+        _ts_sec = s
+        _ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(s))
+    return _ts_str
 
 class LogFileManager:
     def __init__(self):
         self.files = {}
 
     def openLogFile(self, filename):
-        self.files[filename] = open(filename, "a", encoding="utf-8")
+        # 바이너리 + 64KB 버퍼: 미리 인코딩한 bytes를 모아서 write (텍스트 codec 생략)
+        self.files[filename] = open(filename, "ab", buffering=64 * 1024)
+
+    def _flushIfOpen(self, filename):
+        # 읽기 전에 버퍼에 남은 내용을 파일에 반영
+        if filename in self.files:
+            self.files[filename].flush()
 
     def writeLog(self, filename, message):
         if filename not in self.files:
             raise RuntimeError(f"File not open: {filename}")
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.files[filename].write(f"[{ts}] {message}\n")
-        self.files[filename].flush()
+        self.files[filename].write(f"[{_now_ts()}] {message}\n".encode("utf-8"))
+
+    def writeLogs(self, filename, messages):
+        if filename not in self.files:
+            raise RuntimeError(f"File not open: {filename}")
+        ts = _now_ts()
+        buf = bytearray()
+        for m in messages:
+            buf += f"[{ts}] {m}\n".encode("utf-8")
+        self.files[filename].write(buf)
+
+    def flushAll(self):
+        for f in self.files.values():
+            f.flush()
 
-    def readLogs(self, filename):
+    def readLogs(self, filename) -> Iterator[str]:
+        # 파일 전체를 메모리에 올리지 않고 한 줄씩 반환
+        self._flushIfOpen(filename)
         p = Path(filename)
         if not p.exists():
+            return
+        with p.open("r", encoding="utf-8") as f:
+            yield from (line.rstrip("\n") for line in f)
+
+    def readTail(self, filename, n, chunk_size=8192) -> List[str]:
+        # 파일 끝에서부터 청크 단위로 거꾸로 읽어 마지막 n줄만 반환
+        self._flushIfOpen(filename)
+        p = Path(filename)
+        if n <= 0 or not p.exists():
             return []
-        return p.read_text(encoding="utf-8").splitlines()
+        with p.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        if pos > 0:
+            # 청크 경계에 걸린 첫 줄(불완전)은 버림
+            data = data[data.index(b"\n") + 1:]
+        return data.decode("utf-8").splitlines()[-n:]
 
     def closeLogFile(self, filename):
         if filename in self.files:
@@ -37,7 +91,7 @@ if __name__ == "__main__":
     manager.writeLog("debug.log", "User login attempt")
     manager.writeLog("info.log", "Server started successfully")
 
-    errorLogs = manager.readLogs("error.log")
+    errorLogs = list(manager.readLogs("error.log"))
 
     # 출력 값 확인
     print("// error.log 파일 내용")